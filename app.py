@@ -1,90 +1,390 @@
 import os
 import re
-import json
+import orjson
 from flask import Flask, request
 from slack_bolt import App
 from slack_bolt.adapter.flask import SlackRequestHandler
 from dotenv import load_dotenv
 import openai
+import bisect
+import hashlib
+import functools
+import threading
 import concurrent.futures
+import ahocorasick
+from diskcache import Cache
+from cachetools import TTLCache
 
-# ---------------------- THREAD POOL ----------------------
-executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+try:
+    import hyperscan  # optional, only used for very large logs
+except ImportError:
+    hyperscan = None
 
 # ---------------------- LOAD ENV ----------------------
 load_dotenv()
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 SLACK_SIGNING_SECRET = os.getenv("SLACK_SIGNING_SECRET")
 APPROVER_ID = os.getenv("APPROVER_ID")
-openai.api_key = os.getenv("OPENAI_API_KEY")
+APPROVER_IDS = [a for a in (APPROVER_ID, os.getenv("SECOND_APPROVER_ID")) if a]
+# readWrite (default) | readOnly | off -- dev instances can set off to bypass
+CACHE_MODE = os.getenv("CACHE_MODE", "readWrite")
+CACHE_DIR = os.getenv("CACHE_DIR", "/tmp/sf_error_cache")
+CACHE_TTL = 7 * 86400
+# ~1000 tokens; longer errors (stack traces etc.) are cut before prompting
+MAX_SUMMARY_CHARS = 4000
+# errors per batched OpenAI request; keeps each request well inside the model's
+# input/output limits and confines a failed request to its own batch
+SUMMARY_BATCH_SIZE = 20
+
+# ---------------------- THREAD POOL ----------------------
+# Work here is I/O-bound (Slack, OpenAI), so size well past the CPU count.
+# THREAD_POOL_SIZE overrides the default.
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE") or max(32, (os.cpu_count() or 1) * 5))
+executor = concurrent.futures.ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE)
 
 # ---------------------- INIT --------------------------
+# One OpenAI client shared by all handlers and workers
+openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 bolt_app = App(token=SLACK_BOT_TOKEN, signing_secret=SLACK_SIGNING_SECRET)
 flask_app = Flask(__name__)
 handler = SlackRequestHandler(bolt_app)
+summary_cache = Cache(CACHE_DIR) if CACHE_MODE in ("readWrite", "readOnly") else None
+# email -> Slack user id; users_lookupByEmail is Tier 3 rate limited
+user_cache = TTLCache(maxsize=2048, ttl=3600)
+user_cache_lock = threading.Lock()
+
+# ---------------------- PROMPTS -----------------------
+# Static instructions + few-shot examples live in the system message and the
+# error text goes last, so every call shares the same prefix (>1024 tokens)
+# and OpenAI can serve it from its prompt cache. Do not interpolate anything
+# per-call into this string.
+# Also part of the disk cache key: bump the version whenever the prompt changes
+SUMMARY_CACHE_KEY = "sf_error_summary_v1"
+SUMMARY_MODEL = "gpt-4o-mini"
+_PROMPT_BODY = """You are a support assistant for LeadBeam, a field-sales app that syncs leads, contacts, accounts and activities into Salesforce on behalf of its users.
+
+A support engineer will send you a single Salesforce API error message that was returned while syncing a user's data. Summarize it for the support engineer.
+
+Rules:
+- Explain in plain English what went wrong and how the user can fix it.
+- Write one or two short sentences, addressed to the end user, with no greeting and no sign-off.
+- Do not repeat raw error codes, record IDs or API field names unless the user needs them to find the problem; prefer the field label a person would see in Salesforce.
+- If the error is caused by a Salesforce admin configuration (validation rules, required fields, picklist restrictions, permissions, duplicate rules), say so and suggest the user contact their Salesforce admin when they cannot fix it themselves.
+- If the error is transient (timeouts, row locks, request limits), tell the user to retry later.
+- Never invent details that are not in the error message.
+- Never include markdown headings, bullet points or code blocks.
+
+Examples:
+
+Error: FIELD_CUSTOM_VALIDATION_EXCEPTION: Phone number must be in the format (XXX) XXX-XXXX
+Summary: Salesforce rejected the record because the phone number is not in the required (XXX) XXX-XXXX format. Please update the phone number to match that format and save again.
+
+Error: REQUIRED_FIELD_MISSING: Required fields are missing: [Company]
+Summary: The lead could not be saved because the Company field is empty. Please add the company name and try again.
+
+Error: DUPLICATES_DETECTED: Use one of these records?
+Summary: Salesforce found an existing record that matches this one, so it blocked creating a duplicate. Please search for the existing record and update it instead of creating a new one.
+
+Error: INVALID_OR_NULL_FOR_RESTRICTED_PICKLIST: Lead Source: bad value for restricted picklist field: Trade Show 2024
+Summary: The value chosen for Lead Source is not one of the options allowed in Salesforce. Please pick one of the existing Lead Source values, or ask your Salesforce admin to add this one.
+
+Error: INSUFFICIENT_ACCESS_ON_CROSS_REFERENCE_ENTITY: insufficient access rights on cross-reference id
+Summary: Your Salesforce user does not have permission to the related account or owner on this record. Please ask your Salesforce admin to grant you access, or choose a record you own.
+
+Error: UNABLE_TO_LOCK_ROW: unable to obtain exclusive access to this record or 1 records
+Summary: Another process was updating this record in Salesforce at the same time, so the change could not be saved. Please wait a minute and try again.
+
+Error: STRING_TOO_LONG: Title: data value too large: Senior Vice President of Strategic Partnerships and Channel Sales (max length=40)
+Summary: The Title is longer than the 40 characters Salesforce allows for that field. Please shorten the title and save again.
+
+Error: INVALID_EMAIL_ADDRESS: Email: invalid email address: jane.doe@@example.com
+Summary: The email address is not valid. Please correct the email address and try again.
+
+Error: ENTITY_IS_DELETED: entity is deleted
+Summary: The Salesforce record you are trying to update has been deleted. Please check the Salesforce recycle bin or create a new record.
+
+Error: REQUEST_LIMIT_EXCEEDED: TotalRequests Limit exceeded.
+Summary: Your Salesforce organization has used up its API request allowance for now. Please try again later, or ask your Salesforce admin to review the API limits.
+
+Error: FIELD_INTEGRITY_EXCEPTION: Owner ID: owner cannot be inactive user
+Summary: The record is assigned to a Salesforce user who has been deactivated. Please assign the record to an active user and save again.
+
+Error: CANNOT_EXECUTE_FLOW_TRIGGER: The record couldn't be saved because it failed to trigger a flow.
+Summary: An automation set up in Salesforce failed while saving this record. Please contact your Salesforce admin so they can check the flow that runs on this object.
+
+Error: INVALID_CROSS_REFERENCE_KEY: invalid cross reference id
+Summary: The record points to a related account, contact or campaign that no longer exists or that LeadBeam cannot see. Please choose a different related record and save again.
+
+Error: FIELD_FILTER_VALIDATION_EXCEPTION: Value does not exist or does not match filter criteria.
+Summary: The related record you picked is not allowed by a lookup filter that your Salesforce admin has set up. Please choose a record that matches the filter, or ask your admin which records are allowed.
+
+Error: NUMBER_OUTSIDE_VALID_RANGE: Annual Revenue: value outside of valid range on numeric field: 1.0E19
+Summary: The Annual Revenue value is larger than Salesforce can store in that field. Please enter a smaller amount and try again.
+
+"""
+SYSTEM_PROMPT = _PROMPT_BODY + "Respond with only the summary text for the error in the next message."
+BATCH_SYSTEM_PROMPT = _PROMPT_BODY + """The next message is a JSON array of objects with an "id" and an "error".
+Respond with a JSON object of the form {"summaries": [{"id": <id>, "summary": "<summary>"}]} holding exactly one summary per input id."""
 
 # ---------------------- HELPERS -----------------------
+_URL_RE = re.compile(r"URL:")
+_EMAIL_RE = re.compile(r"[\w\.-]+@[\w\.-]+")
+_CODE_RE = re.compile(r"Error code\s*=\s*(\d+)")
+_MSG_RE = re.compile(r"'message':\s*['\"](.+?)['\"]")
+# Logs larger than this are pre-scanned with Hyperscan (when installed) to find
+# block boundaries and skip blocks without a 400/409 code in one DFA pass.
+HYPERSCAN_MIN_CHARS = 65536
+_HS_URL, _HS_CODE = 0, 1
+if hyperscan is not None:
+    _HS_DB = hyperscan.Database()
+    _HS_DB.compile(
+        # \x1c-\x1f: Python's \s matches these on str, Hyperscan's does not
+        expressions=[rb"URL:", rb"Error code[\s\x1c-\x1f]*=[\s\x1c-\x1f]*40[09]"],
+        ids=[_HS_URL, _HS_CODE],
+        elements=2,
+        flags=[0, 0],
+    )
+else:
+    _HS_DB = None
+# one scratch per thread: Hyperscan scratch space cannot be shared by
+# concurrent scans, and block_spans runs on the executor's worker threads
+_hs_local = threading.local()
+
+# escaped \n / \t sequences become spaces; backslashes and quotes are dropped
+_ESC_RE = re.compile(r"\\[nt]")
+_DEL_TABLE = str.maketrans("", "", "\\\"'")
+ACCEPTED_CODES = frozenset({"400", "409"})
+GREETINGS = frozenset({"hi", "hello", "hey"})
+
+# keyword -> rule tag, matched in a single pass over the lowercased message
+RULE_KEYWORDS = [
+    ("already exists", "EXISTS"),
+    ("must be", "VALIDATE"),
+    ("validation", "VALIDATE"),
+    ("not found", "MISSING"),
+]
+# rule tag -> draft template; insertion order is the precedence when several match
+RULE_TEMPLATES = {
+    "EXISTS": "Hi {email}, Please check Salesforce — a record with this data already exists.",
+    "VALIDATE": "Hi {email}, Please correct this field: {message}",
+    "MISSING": "Hi {email}, The requested Salesforce record doesn’t exist.",
+}
+_AC = ahocorasick.Automaton()
+for _kw, _tag in RULE_KEYWORDS:
+    _AC.add_word(_kw, _tag)
+_AC.make_automaton()
+
 def clean_text(s):
     if not s:
         return ""
-    return (
-        s.replace("\\n", " ")
-        .replace("\\t", " ")
-        .replace("\\", "")
-        .replace('"', "")
-        .replace("'", "")
-        .strip()
+    return _ESC_RE.sub(" ", s).translate(_DEL_TABLE).strip()
+
+def summary_cache_key(cleaned):
+    """Keys on prompt version and model too, so prompt/model changes miss the cache."""
+    return hashlib.sha256(f"{SUMMARY_CACHE_KEY}\0{SUMMARY_MODEL}\0{cleaned}".encode()).hexdigest()
+
+def get_cached_summary(cleaned):
+    if summary_cache is None:
+        return None
+    return summary_cache.get(summary_cache_key(cleaned))
+
+def set_cached_summary(cleaned, summary):
+    if summary_cache is not None and CACHE_MODE == "readWrite":
+        summary_cache.set(summary_cache_key(cleaned), summary, expire=CACHE_TTL)
+
+def cached_summary(fn):
+    """
+    Caches summaries on disk keyed by the SHA256 of the prompt version,
+    model and cleaned message.
+    Exceptions propagate, so failed calls are never cached.
+    """
+    @functools.wraps(fn)
+    def wrapper(cleaned):
+        cached = get_cached_summary(cleaned)
+        if cached is not None:
+            return cached
+
+        result = fn(cleaned)
+        set_cached_summary(cleaned, result)
+        return result
+    return wrapper
+
+@cached_summary
+def summarize_cleaned(cleaned):
+    completion = openai_client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": cleaned},
+        ],
+        temperature=0.1,
+        # not a named argument in the pinned SDK, forward it as-is
+        extra_body={"prompt_cache_key": SUMMARY_CACHE_KEY},
     )
+    return completion.choices[0].message.content.strip()
 
-def call_openai_summary(raw_message):
+def prepare_summary_input(raw_message):
+    """Cleans and truncates a raw message; returns None if nothing usable is left."""
     cleaned = clean_text(raw_message)
     if not cleaned or len(cleaned) < 10:
-        return "Could not extract a valid Salesforce error message."
+        return None
+    if len(cleaned) > MAX_SUMMARY_CHARS:
+        cleaned = cleaned[:MAX_SUMMARY_CHARS] + "...[truncated]"
+    return cleaned
 
-    prompt = f"""
-    Summarize this Salesforce error message for a support engineer.
-    Explain in plain English what went wrong and how the user can fix it.
-
-    Error message:
-    {cleaned}
+def summarize_batch(cleaned_list):
+    """
+    Summarizes several cleaned messages with a single OpenAI request.
+    Returns {index: summary} for every entry that came back with a usable
+    summary; request or JSON failures raise.
     """
+    completion = openai_client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": orjson.dumps(
+                    [{"id": n, "error": cleaned} for n, cleaned in enumerate(cleaned_list)]
+                ).decode(),
+            },
+        ],
+        temperature=0.1,
+        response_format={"type": "json_object"},
+        extra_body={"prompt_cache_key": SUMMARY_CACHE_KEY},
+    )
+    data = orjson.loads(completion.choices[0].message.content)
 
-    try:
-        completion = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1,
-        )
-        return completion.choices[0].message.content.strip()
-    except Exception as e:
-        return f"Could not summarize error: {e}"
+    # a malformed entry only costs that entry, not the whole batch
+    results = {}
+    for entry in data.get("summaries", []) if isinstance(data, dict) else []:
+        try:
+            n, summary = int(entry["id"]), entry["summary"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        if isinstance(summary, str) and summary.strip():
+            results[n] = summary.strip()
+    return results
+
+def call_openai_summary_batch(raw_messages):
+    """
+    Summarizes several error messages, SUMMARY_BATCH_SIZE per OpenAI request.
+    Cache hits and duplicates are resolved locally; returns one summary per
+    input, in order.
+    """
+    summaries = [None] * len(raw_messages)
+    pending = {}  # cleaned message -> indexes waiting on it
+    for i, raw_message in enumerate(raw_messages):
+        cleaned = prepare_summary_input(raw_message)
+        if cleaned is None:
+            summaries[i] = "Could not extract a valid Salesforce error message."
+            continue
+        cached = get_cached_summary(cleaned)
+        if cached is not None:
+            summaries[i] = cached
+        else:
+            pending.setdefault(cleaned, []).append(i)
+
+    cleaned_list = list(pending)
+    for offset in range(0, len(cleaned_list), SUMMARY_BATCH_SIZE):
+        batch = cleaned_list[offset:offset + SUMMARY_BATCH_SIZE]
+        if len(batch) == 1:
+            # nothing to batch, use the plain-text prompt (cached by its decorator)
+            try:
+                results = {0: summarize_cleaned(batch[0])}
+            except Exception as e:
+                results, error = {}, e
+        else:
+            try:
+                results = summarize_batch(batch)
+                error = "missing from batch response"
+            except Exception as e:
+                results, error = {}, e
+
+        for n, cleaned in enumerate(batch):
+            summary = results.get(n)
+            if summary is None:
+                summary = f"Could not summarize error: {error}"
+            elif len(batch) > 1:
+                set_cached_summary(cleaned, summary)
+            for i in pending[cleaned]:
+                summaries[i] = summary
+
+    return summaries
+
+def lookup_user_id(email):
+    """Returns the Slack user id for an email, cached for an hour."""
+    with user_cache_lock:
+        user_id = user_cache.get(email)
+    if user_id:
+        return user_id
+
+    res = bolt_app.client.users_lookupByEmail(email=email)
+    user_id = res["user"]["id"]
+    with user_cache_lock:
+        user_cache[email] = user_id
+    return user_id
+
+def block_spans(full_text):
+    """
+    Returns (start, end) offsets of each 'URL:' block in the log.
+    Large ASCII logs go through Hyperscan, which also drops blocks that
+    cannot hold a 400/409 code; offsets are only valid on ASCII since
+    Hyperscan reports byte positions.
+    """
+    if _HS_DB is None or len(full_text) <= HYPERSCAN_MIN_CHARS or not full_text.isascii():
+        bounds = [m.start() for m in _URL_RE.finditer(full_text)] + [len(full_text)]
+        return list(zip(bounds, bounds[1:]))
+
+    url_starts, code_ends = [], []
+    def on_match(match_id, start, end, flags, context):
+        if match_id == _HS_URL:
+            url_starts.append(end - 4)
+        else:
+            code_ends.append(end)
+
+    scratch = getattr(_hs_local, "scratch", None)
+    if scratch is None:
+        scratch = _hs_local.scratch = hyperscan.Scratch(_HS_DB)
+    _HS_DB.scan(full_text.encode("ascii"), match_event_handler=on_match, scratch=scratch)
+
+    bounds = url_starts + [len(full_text)]
+    return [
+        (start, end)
+        for start, end in zip(bounds, bounds[1:])
+        if bisect.bisect_right(code_ends, start) < bisect.bisect_right(code_ends, end)
+    ]
 
 def parse_error_blocks(full_text):
     """
     Splits a giant log message into individual error blocks.
     Each block starts with 'URL:' and continues until the next 'URL:'.
+    Blocks are scanned in place by offset, without copying them out.
     Returns a list of parsed error dicts.
     """
-    blocks = full_text.split("URL:")
     parsed_errors = []
 
-    for block in blocks[1:]:  # skip the first part before first URL
-        text = "URL:" + block.strip()
+    for start, end in block_spans(full_text):
+        # cheap literal checks first; most blocks in a noisy log are not 400/409
+        if full_text.find("Error code", start, end) == -1 or (
+            full_text.find("400", start, end) == -1 and full_text.find("409", start, end) == -1
+        ):
+            continue
 
         # email
-        email = re.search(r"[\w\.-]+@[\w\.-]+", text)
+        email = _EMAIL_RE.search(full_text, start, end)
         email = email.group(0) if email else None
 
         # error code
-        code = re.search(r"Error code\s*=\s*(\d+)", text)
+        code = _CODE_RE.search(full_text, start, end)
         code = code.group(1) if code else None
 
         # message
-        message_match = re.search(r"'message':\s*['\"](.+?)['\"]", text)
+        message_match = _MSG_RE.search(full_text, start, end)
         message = message_match.group(1).strip() if message_match else None
 
         # Only accept 400/409 errors
-        if email and code in ["400", "409"] and message:
+        if email and code in ACCEPTED_CODES and message:
             parsed_errors.append({
                 "email": email,
                 "code": code,
@@ -93,20 +393,106 @@ def parse_error_blocks(full_text):
 
     return parsed_errors
 
-def draft_fix_message(email, message):
-    msg_lower = message.lower()
-    if "already exists" in msg_lower:
-        suggestion = "Please check Salesforce — a record with this data already exists."
-    elif "must be" in msg_lower or "validation" in msg_lower:
-        suggestion = f"Please correct this field: {message}"
-    elif "not found" in msg_lower:
-        suggestion = "The requested Salesforce record doesn’t exist."
-    else:
-        suggestion = call_openai_summary(message)
+def match_rule(message):
+    """Returns the tag of the highest-precedence rule matching a message, or None."""
+    tags = {tag for _, tag in _AC.iter(message.lower())}
+    return next((tag for tag in RULE_TEMPLATES if tag in tags), None)
 
-    return f"Hi {email}, {suggestion}"
+def format_draft(parsed, summary=None):
+    """
+    Formats the draft for one parsed error: its rule template when a rule
+    matches, otherwise the given OpenAI summary. Returns None when no rule
+    matches and no summary was given.
+    """
+    tag = match_rule(parsed["message"])
+    if tag:
+        return RULE_TEMPLATES[tag].format(email=parsed["email"], message=parsed["message"])
+    if summary is None:
+        return None
+    return f"Hi {parsed['email']}, {summary}"
+
+def draft_fix_messages(parsed_errors):
+    """
+    Drafts a fix message for each parsed error, in order. Canned rules are
+    tried first; everything left goes to OpenAI via call_openai_summary_batch.
+    """
+    drafts = [format_draft(parsed) for parsed in parsed_errors]
+    unmatched = [i for i, draft in enumerate(drafts) if draft is None]
+    if unmatched:
+        summaries = call_openai_summary_batch([parsed_errors[i]["message"] for i in unmatched])
+        for i, summary in zip(unmatched, summaries):
+            drafts[i] = format_draft(parsed_errors[i], summary)
+    return drafts
 
 # ---------------------- SLACK HANDLERS ----------------------
+def _process_error(parsed, draft, logger):
+    """Posts the drafted fix for one parsed error to each approver."""
+    try:
+        # identical for every approver, so build it once
+        value_json = orjson.dumps({**parsed, "draft": draft}).decode()
+        summary_text = f"*Detected Salesforce Error*\nEmail: {parsed['email']}\nCode: {parsed['code']}\nError: {parsed['message']}\n\n*Draft Message:*\n{draft}"
+        blocks = [
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": summary_text,
+                },
+            },
+            {
+                "type": "actions",
+                "elements": [
+                    {
+                        "type": "button",
+                        "text": {"type": "plain_text", "text": "✅ Approve"},
+                        "style": "primary",
+                        "value": value_json,
+                        "action_id": "approve_fix",
+                    },
+                    {
+                        "type": "button",
+                        "text": {"type": "plain_text", "text": "✏️ Edit"},
+                        "value": value_json,
+                        "action_id": "edit_fix",
+                    },
+                    {
+                        "type": "button",
+                        "text": {"type": "plain_text", "text": "🚫 Reject"},
+                        "style": "danger",
+                        "value": "reject",
+                        "action_id": "reject_fix",
+                    },
+                ],
+            },
+        ]
+
+        for approver in APPROVER_IDS:
+            bolt_app.client.chat_postMessage(channel=approver, text=summary_text, blocks=blocks)
+    except Exception as e:
+        logger.error(f"Error posting draft for {parsed['email']}: {e}")
+
+def _process_message(text, user, say, logger):
+    try:
+        if text.lower().strip() in GREETINGS:
+            say(f"Hey <@{user}> 👋 I'm alive and connected!")
+            return
+
+        # Parse MULTIPLE errors in one Slack message
+        parsed_errors = parse_error_blocks(text)
+        if not parsed_errors:
+            return
+
+        print("✅ Found errors:", parsed_errors)
+
+        drafts = draft_fix_messages(parsed_errors)
+
+        # Send each error as a separate approval block. Submit without waiting:
+        # blocking a pool worker on other pool tasks can starve the pool.
+        for parsed, draft in zip(parsed_errors, drafts):
+            executor.submit(_process_error, parsed, draft, logger)
+    except Exception as e:
+        logger.error(f"Error handling message: {e}")
+
 @bolt_app.event("message")
 def handle_message_events(body, say, logger):
     event = body.get("event", {})
@@ -116,63 +502,8 @@ def handle_message_events(body, say, logger):
     if not text or event.get("bot_id"):
         return
 
-    if text.lower().strip() in ["hi", "hello", "hey"]:
-        say(f"Hey <@{user}> 👋 I'm alive and connected!")
-        return
-
-    # Parse MULTIPLE errors in one Slack message
-    parsed_errors = parse_error_blocks(text)
-    if not parsed_errors:
-        return
-
-    print("✅ Found errors:", parsed_errors)
-
-    approver_ids = [APPROVER_ID, os.getenv("SECOND_APPROVER_ID")]
-
-    # Send each error as a separate approval block
-    for parsed in parsed_errors:
-        draft = draft_fix_message(parsed["email"], parsed["message"])
-
-        for approver in approver_ids:
-            if approver:
-                bolt_app.client.chat_postMessage(
-                    channel=approver,
-                    text=f"*Detected Salesforce Error*\nEmail: {parsed['email']}\nCode: {parsed['code']}\nError: {parsed['message']}\n\n*Draft Message:*\n{draft}",
-                    blocks=[
-                        {
-                            "type": "section",
-                            "text": {
-                                "type": "mrkdwn",
-                                "text": f"*Detected Salesforce Error*\nEmail: {parsed['email']}\nCode: {parsed['code']}\nError: {parsed['message']}\n\n*Draft Message:*\n{draft}",
-                            },
-                        },
-                        {
-                            "type": "actions",
-                            "elements": [
-                                {
-                                    "type": "button",
-                                    "text": {"type": "plain_text", "text": "✅ Approve"},
-                                    "style": "primary",
-                                    "value": json.dumps(parsed | {"draft": draft}),
-                                    "action_id": "approve_fix",
-                                },
-                                {
-                                    "type": "button",
-                                    "text": {"type": "plain_text", "text": "✏️ Edit"},
-                                    "value": json.dumps(parsed | {"draft": draft}),
-                                    "action_id": "edit_fix",
-                                },
-                                {
-                                    "type": "button",
-                                    "text": {"type": "plain_text", "text": "🚫 Reject"},
-                                    "style": "danger",
-                                    "value": "reject",
-                                    "action_id": "reject_fix",
-                                },
-                            ],
-                        },
-                    ],
-                )
+    # Return to Bolt right away; parsing, OpenAI and posting run in the pool
+    executor.submit(_process_message, text, user, say, logger)
 
 # ---------- APPROVE ----------
 @bolt_app.action("approve_fix")
@@ -180,13 +511,12 @@ def approve_fix(ack, body, logger):
     ack(response_action="clear")
     def handle_action(app_instance):
         try:
-            data = json.loads(body["actions"][0]["value"])
+            data = orjson.loads(body["actions"][0]["value"])
             email = data["email"]
             draft = data["draft"]
 
             try:
-                res = app_instance.client.users_lookupByEmail(email=email)
-                user_id = res["user"]["id"]
+                user_id = lookup_user_id(email)
                 app_instance.client.chat_postMessage(channel=user_id, text=draft)
                 app_instance.client.chat_postMessage(
                     channel=APPROVER_ID,
@@ -205,7 +535,7 @@ def approve_fix(ack, body, logger):
 @bolt_app.action("edit_fix")
 def edit_fix(ack, body):
     ack()
-    data = json.loads(body["actions"][0]["value"])
+    data = orjson.loads(body["actions"][0]["value"])
     draft = data["draft"]
 
     # open a modal with prefilled draft
@@ -216,7 +546,7 @@ def edit_fix(ack, body):
             "callback_id": "submit_edit",
             "title": {"type": "plain_text", "text": "Edit Draft Message"},
             "submit": {"type": "plain_text", "text": "Send"},
-            "private_metadata": json.dumps(data),
+            "private_metadata": orjson.dumps(data).decode(),
             "blocks": [
                 {
                     "type": "input",
@@ -236,24 +566,28 @@ def edit_fix(ack, body):
 @bolt_app.view("submit_edit")
 def handle_edit_submission(ack, body, logger):
     ack()
-    private_data = json.loads(body["view"]["private_metadata"])
-    edited_text = body["view"]["state"]["values"]["edit_block"]["edited_text"]["value"]
-    email = private_data["email"]
+    def handle_submission(app_instance):
+        try:
+            private_data = orjson.loads(body["view"]["private_metadata"])
+            edited_text = body["view"]["state"]["values"]["edit_block"]["edited_text"]["value"]
+            email = private_data["email"]
 
-    # Try sending to Slack user or notify approver
-    try:
-        res = bolt_app.client.users_lookupByEmail(email=email)
-        user_id = res["user"]["id"]
-        bolt_app.client.chat_postMessage(channel=user_id, text=edited_text)
-        bolt_app.client.chat_postMessage(
-            channel=APPROVER_ID,
-            text=f"✏️ Edited message sent to Slack user ({email})"
-        )
-    except Exception as e:
-        bolt_app.client.chat_postMessage(
-            channel=APPROVER_ID,
-            text=f"⚠️ Could not find Slack user for {email}. Please send manually.\nError: {e}"
-        )
+            # Try sending to Slack user or notify approver
+            try:
+                user_id = lookup_user_id(email)
+                app_instance.client.chat_postMessage(channel=user_id, text=edited_text)
+                app_instance.client.chat_postMessage(
+                    channel=APPROVER_ID,
+                    text=f"✏️ Edited message sent to Slack user ({email})"
+                )
+            except Exception as e:
+                app_instance.client.chat_postMessage(
+                    channel=APPROVER_ID,
+                    text=f"⚠️ Could not find Slack user for {email}. Please send manually.\nError: {e}"
+                )
+        except Exception as e:
+            logger.error(f"Error handling submit_edit: {e}")
+    executor.submit(handle_submission, bolt_app)
 
 # ---------- REJECT ----------
 @bolt_app.action("reject_fix")
@@ -272,7 +606,5 @@ def slack_events():
     return handler.handle(request)
 
 # ---------------------- RUN ----------------------
-if __name__ == "__main__":
-    print("⚡ Leadbeam Error Agent running...")
-    port = int(os.environ.get("PORT", 3000))
-    flask_app.run(host="0.0.0.0", port=port)
\ No newline at end of file
+# Served by gunicorn with gevent workers, see Procfile:
+#   gunicorn -k gevent -w 1 --worker-connections 1000 -b 0.0.0.0:${PORT:-3000} app:flask_app